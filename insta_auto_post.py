@@ -5,17 +5,24 @@ Uploads photos from images/ directory to Instagram with custom captions.
 """
 
 import os
+import re
+import errno
 import sys
 import shutil
+import random
+import time
 import argparse
 import logging
+from collections import defaultdict
+from functools import lru_cache
+from operator import itemgetter
 from pathlib import Path
-from typing import Optional, Dict, Any
-from dotenv import load_dotenv
-from instagrapi import Client
-from instagrapi.exceptions import LoginRequired
-from PIL import Image
-from PIL.ExifTags import TAGS
+from typing import TYPE_CHECKING, Optional, Dict, List, FrozenSet, Iterable, Tuple, Union, Callable, NamedTuple, Any
+
+# Heavy third-party imports (instagrapi, PIL, dotenv) are deferred to the
+# functions that need them so `--list-vars` and `--help` start instantly
+if TYPE_CHECKING:
+    from instagrapi import Client
 
 # ============================================================================
 # CONFIGURATION
@@ -25,7 +32,11 @@ DEFAULT_CAPTION = ""  # Global default caption when no caption file exists
 IMAGES_DIR = Path("images")
 UPLOADED_DIR = Path("uploaded")
 SESSION_FILE = "instagram_session.json"
-SUPPORTED_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.JPG', '.JPEG', '.PNG'}
+BATCH_DELAY_RANGE = (30, 120)  # Seconds to wait between uploads in --batch mode
+SUPPORTED_EXTENSIONS = frozenset({'.jpg', '.jpeg', '.png'})  # Lowercase; matched case-insensitively
+
+# Matches caption template variables, e.g. {IMAGE_MAKE}
+_VAR_RE = re.compile(r'\{([A-Z0-9_]+)\}')
 
 # ============================================================================
 # LOGGING SETUP
@@ -33,142 +44,248 @@ SUPPORTED_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.JPG', '.JPEG', '.PNG'}
 
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
+    format='%(asctime)s %(levelname)s %(message)s',
     handlers=[
-        logging.FileHandler('instagram_uploader.log'),
+        logging.FileHandler('instagram_uploader.log', delay=True),  # Opened on first record
         logging.StreamHandler(sys.stdout)
     ]
 )
 logger = logging.getLogger(__name__)
 
+# Evaluated once at import; per-placeholder debug logging is gated on it.
+# Changing the log level at runtime requires refreshing this flag.
+_LOG_DEBUG = logger.isEnabledFor(logging.DEBUG)
+
 # ============================================================================
 # CAPTION VARIABLE REGISTRY
 # ============================================================================
 
-def get_variable_registry() -> Dict[str, Dict[str, Any]]:
+# EXIF tag IDs read by the caption variables
+EXIF_MAKE = 0x010F
+EXIF_MODEL = 0x0110
+EXIF_DATETIME = 0x0132
+EXIF_EXPOSURE_TIME = 0x829A
+EXIF_F_NUMBER = 0x829D
+EXIF_ISO_SPEED_RATINGS = 0x8827
+EXIF_FOCAL_LENGTH = 0x920A
+EXIF_IFD_POINTER = 0x8769  # Sub-IFD holding exposure and lens tags
+
+# Tags stored in the Exif sub-IFD rather than IFD0
+EXIF_SUB_IFD_TAGS = frozenset({
+    EXIF_EXPOSURE_TIME,
+    EXIF_F_NUMBER,
+    EXIF_ISO_SPEED_RATINGS,
+    EXIF_FOCAL_LENGTH,
+})
+
+# Metadata keys used for each EXIF tag (matches PIL.ExifTags.TAGS names)
+EXIF_TAG_NAMES = {
+    EXIF_MAKE: 'Make',
+    EXIF_MODEL: 'Model',
+    EXIF_DATETIME: 'DateTime',
+    EXIF_EXPOSURE_TIME: 'ExposureTime',
+    EXIF_F_NUMBER: 'FNumber',
+    EXIF_ISO_SPEED_RATINGS: 'ISOSpeedRatings',
+    EXIF_FOCAL_LENGTH: 'FocalLength',
+}
+
+
+class VarCfg(NamedTuple):
+    """Configuration of a single caption variable."""
+    description: str
+    category: str
+    requires_exif: bool
+    exif_tags: Tuple[int, ...]
+    extractor: Callable[[Dict[str, Any]], Any]
+
+
+# Registry of all available caption variables, built once at import time.
+#
+# Each variable has:
+# - description: What the variable represents
+# - category: Group it belongs to (for organization)
+# - requires_exif: Whether the image must be opened (EXIF data or dimensions)
+# - exif_tags: EXIF tag IDs the extractor reads
+# - extractor: Function that extracts the value from image data
+#
+# To add new variables:
+# 1. Add a VarCfg entry to this dictionary
+# 2. Create extractor function if needed (register new EXIF tags in EXIF_TAG_NAMES)
+# 3. That's it! Variable is now available
+_VARIABLE_REGISTRY: Dict[str, VarCfg] = {
+    # File information
+    'FILE_NAME': VarCfg(
+        description='Image file name without extension',
+        category='File Info',
+        requires_exif=False,
+        exif_tags=(),
+        extractor=lambda img_data: img_data['file_name']
+    ),
+    'FILE_NAME_FULL': VarCfg(
+        description='Image file name with extension',
+        category='File Info',
+        requires_exif=False,
+        exif_tags=(),
+        extractor=lambda img_data: img_data['file_name_full']
+    ),
+    
+    # Camera information
+    'IMAGE_MAKE': VarCfg(
+        description='Camera manufacturer (e.g., Canon, Nikon, Panasonic)',
+        category='Camera',
+        requires_exif=True,
+        exif_tags=(EXIF_MAKE,),
+        extractor=lambda img_data: img_data.get('Make', 'Unknown')
+    ),
+    'IMAGE_MODEL': VarCfg(
+        description='Camera model (e.g., EOS 5D Mark IV, DMC-TZ8)',
+        category='Camera',
+        requires_exif=True,
+        exif_tags=(EXIF_MODEL,),
+        extractor=lambda img_data: img_data.get('Model', 'Unknown')
+    ),
+    'IMAGE_MAKE_TAG': VarCfg(
+        description='Camera make as hashtag (e.g., nikoncorporation)',
+        category='Camera',
+        requires_exif=True,
+        exif_tags=(EXIF_MAKE,),
+        extractor=lambda img_data: to_tag(img_data.get('Make', ''))
+    ),
+    'IMAGE_MODEL_TAG': VarCfg(
+        description='Camera model as hashtag (e.g., eos5dmarkiv)',
+        category='Camera',
+        requires_exif=True,
+        exif_tags=(EXIF_MODEL,),
+        extractor=lambda img_data: to_tag(img_data.get('Model', ''))
+    ),
+    
+    # Exposure settings
+    'IMAGE_F_NUMBER': VarCfg(
+        description='Aperture (f-stop) with "f" prefix',
+        category='Exposure',
+        requires_exif=True,
+        exif_tags=(EXIF_F_NUMBER,),
+        extractor=lambda img_data: f"f{img_data.get('FNumber', 0)}" if img_data.get('FNumber') else 'N/A'
+    ),
+    'IMAGE_EXPOSURE_TIME': VarCfg(
+        description='Shutter speed (e.g., 1/200 sec or 2.5 sec)',
+        category='Exposure',
+        requires_exif=True,
+        exif_tags=(EXIF_EXPOSURE_TIME,),
+        extractor=lambda img_data: format_exposure_time(img_data.get('ExposureTime'))
+    ),
+    'IMAGE_ISO': VarCfg(
+        description='ISO sensitivity with "ISO" prefix',
+        category='Exposure',
+        requires_exif=True,
+        exif_tags=(EXIF_ISO_SPEED_RATINGS,),
+        extractor=lambda img_data: f"ISO {img_data.get('ISOSpeedRatings', 'N/A')}" if img_data.get('ISOSpeedRatings') else 'N/A'
+    ),
+    'IMAGE_PHOTOGRAPHIC_SENSITIVITY': VarCfg(
+        description='ISO value only (number)',
+        category='Exposure',
+        requires_exif=True,
+        exif_tags=(EXIF_ISO_SPEED_RATINGS,),
+        extractor=lambda img_data: str(img_data.get('ISOSpeedRatings', 'N/A'))
+    ),
+    
+    # Lens information
+    'IMAGE_FOCAL_LENGTH': VarCfg(
+        description='Focal length with "mm" suffix (e.g., 42.6 mm)',
+        category='Lens',
+        requires_exif=True,
+        exif_tags=(EXIF_FOCAL_LENGTH,),
+        extractor=lambda img_data: f"{img_data.get('FocalLength', 'N/A')} mm" if img_data.get('FocalLength') else 'N/A'
+    ),
+    'IMAGE_FOCAL_LENGTH_VALUE': VarCfg(
+        description='Focal length value only (number)',
+        category='Lens',
+        requires_exif=True,
+        exif_tags=(EXIF_FOCAL_LENGTH,),
+        extractor=lambda img_data: str(img_data.get('FocalLength', 'N/A'))
+    ),
+    
+    # Date/Time
+    'IMAGE_DATE': VarCfg(
+        description='Date photo was taken (YYYY:MM:DD)',
+        category='Date/Time',
+        requires_exif=True,
+        exif_tags=(EXIF_DATETIME,),
+        extractor=lambda img_data: img_data['_DateTimeParts'][0] if img_data.get('_DateTimeParts') else 'N/A'
+    ),
+    'IMAGE_TIME': VarCfg(
+        description='Time photo was taken (HH:MM:SS)',
+        category='Date/Time',
+        requires_exif=True,
+        exif_tags=(EXIF_DATETIME,),
+        extractor=lambda img_data: img_data['_DateTimeParts'][1] if len(img_data.get('_DateTimeParts', ())) > 1 else 'N/A'
+    ),
+    'IMAGE_DATETIME': VarCfg(
+        description='Full date and time',
+        category='Date/Time',
+        requires_exif=True,
+        exif_tags=(EXIF_DATETIME,),
+        extractor=lambda img_data: img_data.get('DateTime', 'N/A')
+    ),
+    
+    # Image properties
+    'IMAGE_WIDTH': VarCfg(
+        description='Image width in pixels',
+        category='Image Properties',
+        requires_exif=True,
+        exif_tags=(),
+        extractor=lambda img_data: str(img_data.get('width', 'N/A'))
+    ),
+    'IMAGE_HEIGHT': VarCfg(
+        description='Image height in pixels',
+        category='Image Properties',
+        requires_exif=True,
+        exif_tags=(),
+        extractor=lambda img_data: str(img_data.get('height', 'N/A'))
+    ),
+    'IMAGE_ORIENTATION': VarCfg(
+        description='Image orientation (Portrait/Landscape/Square)',
+        category='Image Properties',
+        requires_exif=True,
+        exif_tags=(),
+        extractor=lambda img_data: get_orientation(img_data.get('width'), img_data.get('height'))
+    ),
+}
+
+
+def _categorize_variables(registry: Dict[str, VarCfg]) -> Dict[str, List[Tuple[str, str]]]:
+    """Group (name, description) pairs by category in a single pass, ordered by category name."""
+    categories = defaultdict(list)
+    for var_name, var_config in registry.items():
+        categories[var_config.category].append((var_name, var_config.description))
+    return dict(sorted(categories.items(), key=itemgetter(0)))
+
+
+_CATEGORIZED_VARIABLES = _categorize_variables(_VARIABLE_REGISTRY)
+
+
+def get_variable_registry() -> Dict[str, VarCfg]:
     """
-    Registry of all available caption variables.
+    Return the registry of all available caption variables.
     
-    Each variable has:
-    - description: What the variable represents
-    - category: Group it belongs to (for organization)
-    - extractor: Function that extracts the value from image data
-    
-    To add new variables:
-    1. Add entry to this dictionary
-    2. Create extractor function if needed
-    3. That's it! Variable is now available
+    The registry is built once at import time; see _VARIABLE_REGISTRY.
     """
-    return {
-        # File information
-        'FILE_NAME': {
-            'description': 'Image file name without extension',
-            'category': 'File Info',
-            'extractor': lambda img_data: img_data['file_name']
-        },
-        'FILE_NAME_FULL': {
-            'description': 'Image file name with extension',
-            'category': 'File Info',
-            'extractor': lambda img_data: img_data['file_name_full']
-        },
-        
-        # Camera information
-        'IMAGE_MAKE': {
-            'description': 'Camera manufacturer (e.g., Canon, Nikon, Panasonic)',
-            'category': 'Camera',
-            'extractor': lambda img_data: img_data.get('Make', 'Unknown')
-        },
-        'IMAGE_MODEL': {
-            'description': 'Camera model (e.g., EOS 5D Mark IV, DMC-TZ8)',
-            'category': 'Camera',
-            'extractor': lambda img_data: img_data.get('Model', 'Unknown')
-        },
-        'IMAGE_MAKE_TAG': {
-            'description': 'Camera make as hashtag (e.g., nikoncorporation)',
-            'category': 'Camera',
-            'extractor': lambda img_data: to_tag(img_data.get('Make', ''))
-        },
-        'IMAGE_MODEL_TAG': {
-            'description': 'Camera model as hashtag (e.g., eos5dmarkiv)',
-            'category': 'Camera',
-            'extractor': lambda img_data: to_tag(img_data.get('Model', ''))
-        },
-        
-        # Exposure settings
-        'IMAGE_F_NUMBER': {
-            'description': 'Aperture (f-stop) with "f" prefix',
-            'category': 'Exposure',
-            'extractor': lambda img_data: f"f{img_data.get('FNumber', 0)}" if img_data.get('FNumber') else 'N/A'
-        },
-        'IMAGE_EXPOSURE_TIME': {
-            'description': 'Shutter speed (e.g., 1/200 sec or 2.5 sec)',
-            'category': 'Exposure',
-            'extractor': lambda img_data: format_exposure_time(img_data.get('ExposureTime'))
-        },
-        'IMAGE_ISO': {
-            'description': 'ISO sensitivity with "ISO" prefix',
-            'category': 'Exposure',
-            'extractor': lambda img_data: f"ISO {img_data.get('ISOSpeedRatings', 'N/A')}" if img_data.get('ISOSpeedRatings') else 'N/A'
-        },
-        'IMAGE_PHOTOGRAPHIC_SENSITIVITY': {
-            'description': 'ISO value only (number)',
-            'category': 'Exposure',
-            'extractor': lambda img_data: str(img_data.get('ISOSpeedRatings', 'N/A'))
-        },
-        
-        # Lens information
-        'IMAGE_FOCAL_LENGTH': {
-            'description': 'Focal length with "mm" suffix (e.g., 42.6 mm)',
-            'category': 'Lens',
-            'extractor': lambda img_data: f"{img_data.get('FocalLength', 'N/A')} mm" if img_data.get('FocalLength') else 'N/A'
-        },
-        'IMAGE_FOCAL_LENGTH_VALUE': {
-            'description': 'Focal length value only (number)',
-            'category': 'Lens',
-            'extractor': lambda img_data: str(img_data.get('FocalLength', 'N/A'))
-        },
-        
-        # Date/Time
-        'IMAGE_DATE': {
-            'description': 'Date photo was taken (YYYY:MM:DD)',
-            'category': 'Date/Time',
-            'extractor': lambda img_data: img_data.get('DateTime', 'N/A').split()[0] if img_data.get('DateTime') else 'N/A'
-        },
-        'IMAGE_TIME': {
-            'description': 'Time photo was taken (HH:MM:SS)',
-            'category': 'Date/Time',
-            'extractor': lambda img_data: img_data.get('DateTime', 'N/A').split()[1] if img_data.get('DateTime') and len(img_data.get('DateTime', '').split()) > 1 else 'N/A'
-        },
-        'IMAGE_DATETIME': {
-            'description': 'Full date and time',
-            'category': 'Date/Time',
-            'extractor': lambda img_data: img_data.get('DateTime', 'N/A')
-        },
-        
-        # Image properties
-        'IMAGE_WIDTH': {
-            'description': 'Image width in pixels',
-            'category': 'Image Properties',
-            'extractor': lambda img_data: str(img_data.get('width', 'N/A'))
-        },
-        'IMAGE_HEIGHT': {
-            'description': 'Image height in pixels',
-            'category': 'Image Properties',
-            'extractor': lambda img_data: str(img_data.get('height', 'N/A'))
-        },
-        'IMAGE_ORIENTATION': {
-            'description': 'Image orientation (Portrait/Landscape/Square)',
-            'category': 'Image Properties',
-            'extractor': lambda img_data: get_orientation(img_data.get('width'), img_data.get('height'))
-        },
-    }
+    return _VARIABLE_REGISTRY
+
+
+# Lowercases ASCII letters and drops spaces/hyphens in a single translate() pass
+_TAG_TABLE = str.maketrans({
+    ' ': None,
+    '-': None,
+    **{chr(c): chr(c + 32) for c in range(ord('A'), ord('Z') + 1)},
+})
 
 
 def to_tag(text: str) -> str:
     """Convert text to lowercase tag without spaces."""
     if not text or text == 'Unknown' or text == 'N/A':
         return 'N/A'
-    return text.lower().replace(' ', '').replace('-', '')
+    return text.translate(_TAG_TABLE)
 
 
 def format_exposure_time(exposure_time: Optional[float]) -> str:
@@ -182,23 +299,71 @@ def format_exposure_time(exposure_time: Optional[float]) -> str:
         return f'1/{round(1/exposure_time)} sec'
 
 
+# Indexed by sign(width - height) + 1
+_ORIENTATIONS = ('Portrait', 'Square', 'Landscape')
+
+
 def get_orientation(width, height) -> str:
     """Determine image orientation."""
     if width is None or height is None:
         return 'N/A'
-    if width > height:
-        return 'Landscape'
-    elif height > width:
-        return 'Portrait'
-    else:
-        return 'Square'
+    return _ORIENTATIONS[(width > height) - (width < height) + 1]
 
 
 # ============================================================================
 # IMAGE METADATA EXTRACTION
 # ============================================================================
 
-def extract_image_metadata(image_path: Path) -> Dict[str, Any]:
+def extract_file_metadata(image_path: Path) -> Dict[str, Any]:
+    """
+    Extract metadata derived from the file path alone (no image I/O).
+    
+    Args:
+        image_path: Path to the image file
+    
+    Returns:
+        Dictionary containing file name and path information
+    """
+    return {
+        'file_name': image_path.stem,
+        'file_name_full': image_path.name,
+        'file_path': str(image_path),
+    }
+
+
+def extract_image_metadata(image_path: Path, needed_ids: Optional[Iterable[int]] = None) -> Dict[str, Any]:
+    """
+    Extract metadata from image file, reusing earlier results for the same file.
+    
+    Results are cached per (path, mtime, size), so a file modified on disk is
+    re-read automatically.
+    
+    Args:
+        image_path: Path to the image file
+        needed_ids: EXIF tag IDs to read (defaults to all tags in EXIF_TAG_NAMES)
+    
+    Returns:
+        Dictionary containing all extracted metadata
+    """
+    if needed_ids is not None:
+        needed_ids = frozenset(needed_ids)
+    
+    try:
+        stat = image_path.stat()
+    except OSError:
+        # Let the uncached path report the error
+        return _extract_image_metadata_uncached(image_path, needed_ids)
+    
+    return dict(_extract_image_metadata_cached(str(image_path), stat.st_mtime_ns, stat.st_size, needed_ids))
+
+
+@lru_cache(maxsize=128)
+def _extract_image_metadata_cached(path_str: str, mtime_ns: int, size: int, needed_ids: Optional[FrozenSet[int]]) -> Dict[str, Any]:
+    """Memoized metadata extraction keyed by path, mtime, size and requested tags."""
+    return _extract_image_metadata_uncached(Path(path_str), needed_ids)
+
+
+def _extract_image_metadata_uncached(image_path: Path, needed_ids: Optional[Iterable[int]] = None) -> Dict[str, Any]:
     """
     Extract metadata from image file.
     
@@ -207,45 +372,58 @@ def extract_image_metadata(image_path: Path) -> Dict[str, Any]:
     - EXIF data (camera, exposure, lens, etc.)
     - Image properties (dimensions, etc.)
     
+    Only the requested EXIF tags are read; everything else in the EXIF
+    block is left alone.
+    
     Args:
         image_path: Path to the image file
+        needed_ids: EXIF tag IDs to read (defaults to all tags in EXIF_TAG_NAMES)
     
     Returns:
         Dictionary containing all extracted metadata
     """
-    metadata = {
-        'file_name': image_path.stem,
-        'file_name_full': image_path.name,
-        'file_path': str(image_path),
-    }
+    metadata = extract_file_metadata(image_path)
+    if needed_ids is None:
+        needed_ids = EXIF_TAG_NAMES.keys()
+    
+    from PIL import Image
     
     try:
+        # Image.open() is lazy: only the headers are parsed, pixel data is never loaded
         with Image.open(image_path) as img:
             # Get image dimensions
             metadata['width'] = img.width
             metadata['height'] = img.height
             
             # Extract EXIF data
-            exif_data = img._getexif()
+            exif_data = img.getexif()
             if exif_data:
-                for tag_id, value in exif_data.items():
-                    tag_name = TAGS.get(tag_id, tag_id)
-                    
-                    # Handle rational numbers (fractions)
-                    if isinstance(value, tuple) and len(value) == 2:
-                        try:
-                            value = value[0] / value[1] if value[1] != 0 else value[0]
-                        except (TypeError, ZeroDivisionError):
-                            pass
+                # Exposure and lens tags live in the Exif sub-IFD; decode it
+                # once, and only if one of those tags is needed
+                exif_ifd = None
+                if not EXIF_SUB_IFD_TAGS.isdisjoint(needed_ids):
+                    exif_ifd = exif_data.get_ifd(EXIF_IFD_POINTER)
+                
+                for tag_id in needed_ids:
+                    source = exif_ifd if tag_id in EXIF_SUB_IFD_TAGS else exif_data
+                    value = source.get(tag_id)
+                    if value is None:
+                        continue
                     
-                    metadata[tag_name] = value
+                    # Rationals (FNumber, ExposureTime, ...) come back as
+                    # IFDRational, which already behaves like a number
+                    metadata[EXIF_TAG_NAMES[tag_id]] = value
                 
-                logger.debug(f"Extracted EXIF data: {len(exif_data)} tags")
+                # Split once so IMAGE_DATE and IMAGE_TIME don't each re-split
+                if 'DateTime' in metadata:
+                    metadata['_DateTimeParts'] = tuple(str(metadata['DateTime']).split())
+                
+                logger.debug("Extracted EXIF data: %d tags requested", len(needed_ids))
             else:
-                logger.warning(f"No EXIF data found in {image_path}")
+                logger.warning("No EXIF data found in %s", image_path)
     
     except Exception as e:
-        logger.error(f"Error extracting metadata from {image_path}: {e}")
+        logger.error("Error extracting metadata from %s: %s", image_path, e)
     
     return metadata
 
@@ -272,73 +450,93 @@ def process_caption_template(caption: str, image_path: Path) -> str:
     if '{' not in caption:
         return caption
     
-    # Extract image metadata
-    metadata = extract_image_metadata(image_path)
+    # Use the prebuilt registry directly (no accessor call per caption)
+    registry = _VARIABLE_REGISTRY
     
-    # Get variable registry
-    registry = get_variable_registry()
+    # Nothing to do if no registered variable is referenced (e.g. "{literal}")
+    referenced = set(_VAR_RE.findall(caption)) & registry.keys()
+    if not referenced:
+        return caption
     
-    # Replace each variable
-    processed_caption = caption
-    for var_name, var_config in registry.items():
-        placeholder = f'{{{var_name}}}'
-        if placeholder in processed_caption:
-            try:
-                value = var_config['extractor'](metadata)
-                processed_caption = processed_caption.replace(placeholder, str(value))
-                logger.debug(f"Replaced {placeholder} with {value}")
-            except Exception as e:
-                logger.error(f"Error processing variable {var_name}: {e}")
-                processed_caption = processed_caption.replace(placeholder, 'N/A')
+    # Only open the image if a referenced variable needs EXIF/dimensions
+    if any(registry[var_name].requires_exif for var_name in referenced):
+        needed_ids = set()
+        for var_name in referenced:
+            needed_ids.update(registry[var_name].exif_tags)
+        metadata = extract_image_metadata(image_path, needed_ids)
+    else:
+        metadata = extract_file_metadata(image_path)
     
-    return processed_caption
+    # Resolve each referenced variable once, however often it appears
+    values = {}
+    for var_name in referenced:
+        try:
+            value = str(registry[var_name].extractor(metadata))
+            if _LOG_DEBUG:
+                logger.debug("Replaced {%s} with %s", var_name, value)
+        except Exception as e:
+            logger.error("Error processing variable %s: %s", var_name, e)
+            value = 'N/A'
+        values[var_name] = value
+    
+    # Replace all variables in a single pass over the caption; unregistered
+    # placeholders are left untouched
+    return _VAR_RE.sub(lambda match: values.get(match.group(1), match.group(0)), caption)
 
 
 def list_available_variables():
     """Print all available caption variables grouped by category."""
-    registry = get_variable_registry()
+    registry = _VARIABLE_REGISTRY
+    categories = _CATEGORIZED_VARIABLES
     
-    # Group by category
-    categories = {}
-    for var_name, var_config in registry.items():
-        category = var_config['category']
-        if category not in categories:
-            categories[category] = []
-        categories[category].append({
-            'name': var_name,
-            'description': var_config['description']
-        })
-    
-    # Print organized list
-    print("\n" + "="*70)
-    print("AVAILABLE CAPTION VARIABLES")
-    print("="*70)
-    print("\nUsage: {VARIABLE_NAME} in your caption files")
-    print("\nExample caption file:")
-    print("  {FILE_NAME}.")
-    print("  {IMAGE_MAKE} {IMAGE_MODEL} | {IMAGE_F_NUMBER} | {IMAGE_EXPOSURE_TIME} | {IMAGE_FOCAL_LENGTH} | ISO {IMAGE_PHOTOGRAPHIC_SENSITIVITY}")
-    print("  #landscape #nature\n")
-    
-    for category in sorted(categories.keys()):
-        print(f"\n{category}")
-        print("-" * len(category))
-        for var in categories[category]:
-            print(f"  {{{var['name']:<40}}} - {var['description']}")
-    
-    print("\n" + "="*70)
-    print(f"Total: {len(registry)} variables available")
-    print("="*70 + "\n")
+    # Build organized list, then write it in one go
+    out = []
+    out.append("\n" + "="*70)
+    out.append("AVAILABLE CAPTION VARIABLES")
+    out.append("="*70)
+    out.append("\nUsage: {VARIABLE_NAME} in your caption files")
+    out.append("\nExample caption file:")
+    out.append("  {FILE_NAME}.")
+    out.append("  {IMAGE_MAKE} {IMAGE_MODEL} | {IMAGE_F_NUMBER} | {IMAGE_EXPOSURE_TIME} | {IMAGE_FOCAL_LENGTH} | ISO {IMAGE_PHOTOGRAPHIC_SENSITIVITY}")
+    out.append("  #landscape #nature\n")
+    
+    for category, variables in categories.items():
+        out.append(f"\n{category}")
+        out.append("-" * len(category))
+        for var_name, description in variables:
+            out.append(f"  {{{var_name:<40}}} - {description}")
+    
+    out.append("\n" + "="*70)
+    out.append(f"Total: {len(registry)} variables available")
+    out.append("="*70 + "\n")
+    
+    sys.stdout.write("\n".join(out) + "\n")
 
 
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
 
+def _caption_path_for(image_path: Path) -> Path:
+    """Return the caption file path for an image (e.g. photo.jpg -> photo.jpg.caption.txt)."""
+    return image_path.with_name(image_path.name + '.caption.txt')
+
+
+def is_supported_image(file_name: str) -> bool:
+    """Check whether a file name has a supported image extension (case-insensitive)."""
+    return os.path.splitext(file_name)[1].lower() in SUPPORTED_EXTENSIONS
+
+
 def ensure_directories():
     """Create necessary directories if they don't exist."""
-    IMAGES_DIR.mkdir(exist_ok=True)
-    UPLOADED_DIR.mkdir(exist_ok=True)
-    logger.info(f"Directories ensured: {IMAGES_DIR}, {UPLOADED_DIR}")
+    # One listing of the working directory instead of a mkdir() per directory;
+    # paths outside it never match and fall through to mkdir()
+    with os.scandir('.') as entries:
+        existing = {entry.name for entry in entries if entry.is_dir()}
+    for directory in (IMAGES_DIR, UPLOADED_DIR):
+        if str(directory) not in existing:
+            directory.mkdir(exist_ok=True)
+    logger.info("Directories ensured: %s, %s", IMAGES_DIR, UPLOADED_DIR)
 
 
 def find_image_to_upload() -> Optional[Path]:
@@ -351,28 +549,32 @@ def find_image_to_upload() -> Optional[Path]:
     Returns:
         Path to the image file, or None if no images found.
     """
-    # Get all image files
-    image_files = []
-    for ext in SUPPORTED_EXTENSIONS:
-        image_files.extend(IMAGES_DIR.glob(f"*{ext}"))
-    
-    if not image_files:
-        logger.warning(f"No images found in {IMAGES_DIR}")
-        return None
-    
-    # Sort alphabetically and return the first one
+    # Get all image files in a single directory scan. DirEntry objects are kept
+    # (not Paths) so stat-based policies reuse the entry's cached stat()
+    with os.scandir(IMAGES_DIR) as it:
+        entries = [
+            entry for entry in it
+            if is_supported_image(entry.name) and entry.is_file()
+        ]
+    
+    # Pick the first one alphabetically (single pass, no full sort)
     # You can modify this logic to implement different selection strategies:
-    # - Random selection: random.choice(image_files)
-    # - Oldest first: min(image_files, key=lambda x: x.stat().st_mtime)
-    # - Newest first: max(image_files, key=lambda x: x.stat().st_mtime)
-    image_files.sort()
-    selected_image = image_files[0]
+    # - Random selection: random.choice(entries)
+    # - Oldest first: min(entries, key=lambda e: e.stat().st_mtime)
+    # - Newest first: max(entries, key=lambda e: e.stat().st_mtime)
+    selected_entry = min(entries, key=lambda e: e.name, default=None)
+    
+    if selected_entry is None:
+        # Callers decide how to report an empty queue (an error for a single
+        # upload, the normal end of a --batch run)
+        return None
     
-    logger.info(f"Selected image: {selected_image}")
+    selected_image = Path(selected_entry.path)
+    logger.info("Selected image: %s", selected_image)
     return selected_image
 
 
-def get_caption_for_image(image_path: Path, custom_caption: Optional[str] = None) -> str:
+def get_caption_for_image(image_path: Path, custom_caption: Optional[str] = None, caption_file: Optional[Path] = None) -> str:
     """
     Get caption for an image.
     
@@ -384,6 +586,7 @@ def get_caption_for_image(image_path: Path, custom_caption: Optional[str] = None
     Args:
         image_path: Path to the image file
         custom_caption: Optional custom caption provided via CLI
+        caption_file: Optional path to the caption file (derived from image_path if omitted)
     
     Returns:
         Caption text to use for the upload (with variables processed)
@@ -394,32 +597,37 @@ def get_caption_for_image(image_path: Path, custom_caption: Optional[str] = None
         logger.info("Using custom caption provided via argument")
         raw_caption = custom_caption
     else:
-        # Check for caption file
-        caption_file = Path(f"{image_path}.caption.txt")
-        if caption_file.exists():
-            try:
-                with open(caption_file, 'r', encoding='utf-8') as f:
-                    raw_caption = f.read().strip()
-                logger.info(f"Using caption from file: {caption_file}")
-            except Exception as e:
-                logger.error(f"Error reading caption file {caption_file}: {e}")
+        # Check for caption file (a missing file is not an error)
+        if caption_file is None:
+            caption_file = _caption_path_for(image_path)
+        try:
+            raw_caption = caption_file.read_text(encoding='utf-8').strip()
+            logger.info("Using caption from file: %s", caption_file)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.error("Error reading caption file %s: %s", caption_file, e)
         
         if raw_caption is None:
             logger.info("Using default caption")
             raw_caption = DEFAULT_CAPTION
     
+    # Literal captions need no processing (and no comparison below)
+    if '{' not in raw_caption:
+        return raw_caption
+    
     # Process template variables in caption
     processed_caption = process_caption_template(raw_caption, image_path)
     
     if raw_caption != processed_caption:
         logger.info("Caption template variables processed")
-        logger.debug(f"Original: {raw_caption}")
-        logger.debug(f"Processed: {processed_caption}")
+        logger.debug("Original: %s", raw_caption)
+        logger.debug("Processed: %s", processed_caption)
     
     return processed_caption
 
 
-def login_instagram(username: str, password: str) -> Client:
+def login_instagram(username: str, password: str) -> "Client":
     """
     Login to Instagram with session management.
     
@@ -437,6 +645,9 @@ def login_instagram(username: str, password: str) -> Client:
     Returns:
         Authenticated Instagram client
     """
+    from instagrapi import Client
+    from instagrapi.exceptions import LoginRequired
+    
     client = Client()
     
     # Configure client to avoid bot detection
@@ -448,16 +659,25 @@ def login_instagram(username: str, password: str) -> Client:
     if session_path.exists():
         logger.info("Loading existing session...")
         try:
+            # login() returns immediately for a loaded session but stores the
+            # credentials instagrapi needs for relogin/challenge handling; a
+            # small authenticated request verifies the session is still
+            # valid. Only an expired (LoginRequired) or unreadable (ValueError)
+            # session forces a new login; other errors (e.g. network) propagate
             client.load_settings(session_path)
             client.login(username, password)
-            
-            # Verify session is still valid
-            client.get_timeline_feed()
+            client.account_info()
             logger.info("Successfully loaded existing session")
             return client
-        except Exception as e:
-            logger.warning(f"Existing session invalid or expired: {e}")
+        except (LoginRequired, ValueError) as e:
+            logger.warning("Existing session invalid or expired: %s", e)
             logger.info("Creating new session...")
+            
+            # Start from clean settings but keep the device UUIDs, so the new
+            # login looks like the same device
+            old_settings = client.get_settings()
+            client.set_settings({})
+            client.set_uuids(old_settings.get("uuids", {}))
     
     # Create new session
     try:
@@ -488,18 +708,21 @@ def login_instagram(username: str, password: str) -> Client:
         
         # Save session for future use
         client.dump_settings(session_path)
-        logger.info(f"Session saved to {session_path}")
+        logger.info("Session saved to %s", session_path)
         
         return client
     except Exception as e:
-        logger.error(f"Login failed: {e}")
+        logger.error("Login failed: %s", e)
         raise
 
 
-def upload_photo_to_instagram(client: Client, image_path: Path, caption: str) -> bool:
+def upload_photo_to_instagram(client: "Client", image_path: Path, caption: str) -> bool:
     """
     Upload a photo to Instagram.
     
+    instagrapi only accepts a file path and reads the image itself; it
+    cannot be handed an already-open file or in-memory buffer.
+    
     Args:
         client: Authenticated Instagram client
         image_path: Path to the image file
@@ -509,51 +732,96 @@ def upload_photo_to_instagram(client: Client, image_path: Path, caption: str) ->
         True if upload successful, False otherwise
     """
     try:
-        logger.info(f"Uploading {image_path} to Instagram...")
-        logger.info(f"Caption: {caption[:100]}..." if len(caption) > 100 else f"Caption: {caption}")
+        logger.info("Uploading %s to Instagram...", image_path)
+        logger.info("Caption: %s%s", caption[:100], "..." if len(caption) > 100 else "")
         
         media = client.photo_upload(
             path=str(image_path),
             caption=caption
         )
         
-        logger.info(f"Successfully uploaded! Media ID: {media.pk}")
+        logger.info("Successfully uploaded! Media ID: %s", media.pk)
         return True
     except Exception as e:
-        logger.error(f"Upload failed: {e}")
+        logger.error("Upload failed: %s", e)
         return False
 
 
-def move_to_uploaded(image_path: Path):
+def move_file(src: Union[str, Path], dst: Union[str, Path]):
+    """
+    Move a file, using a single rename when both paths share a filesystem.
+    
+    Args:
+        src: File to move
+        dst: Destination path
+    """
+    try:
+        os.replace(src, dst)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        # Different filesystems: fall back to copy + delete
+        shutil.move(src, dst)
+
+
+def move_to_uploaded(image_path: Path, caption_file: Optional[Path] = None):
     """
     Move uploaded image and its caption file (if exists) to uploaded directory.
     
     Args:
         image_path: Path to the uploaded image
+        caption_file: Optional path to the caption file (derived from image_path if omitted)
     """
+    # Plain os.path string operations here; no intermediate Path objects needed
+    uploaded_dir = str(UPLOADED_DIR)
     try:
         # Check if image still exists (some libraries might move it)
-        if not image_path.exists():
-            logger.warning(f"Image {image_path} no longer exists (may have been moved during upload)")
+        if not os.path.exists(image_path):
+            logger.warning("Image %s no longer exists (may have been moved during upload)", image_path)
             logger.warning("Upload was successful, but file cleanup skipped")
             return
         
         # Move image
-        dest_image = UPLOADED_DIR / image_path.name
-        shutil.move(str(image_path), str(dest_image))
-        logger.info(f"Moved {image_path} to {dest_image}")
+        dest_image = os.path.join(uploaded_dir, image_path.name)
+        move_file(image_path, dest_image)
+        logger.info("Moved %s to %s", image_path, dest_image)
         
-        # Move caption file if it exists
-        caption_file = Path(f"{image_path}.caption.txt")
-        if caption_file.exists():
-            dest_caption = UPLOADED_DIR / caption_file.name
-            shutil.move(str(caption_file), str(dest_caption))
-            logger.info(f"Moved {caption_file} to {dest_caption}")
+        # Move caption file if it exists (attempt the move directly instead of
+        # checking first, so it can't vanish between the check and the move)
+        if caption_file is None:
+            caption_file = _caption_path_for(image_path)
+        dest_caption = os.path.join(uploaded_dir, caption_file.name)
+        try:
+            move_file(caption_file, dest_caption)
+            logger.info("Moved %s to %s", caption_file, dest_caption)
+        except FileNotFoundError:
+            pass
     except Exception as e:
-        logger.error(f"Error moving files: {e}")
+        logger.error("Error moving files: %s", e)
         raise
 
 
+def upload_and_archive(client: "Client", image_path: Path, caption: str, caption_file: Optional[Path] = None) -> bool:
+    """
+    Upload a photo and move it (and its caption file) to the uploaded directory.
+    
+    Args:
+        client: Authenticated Instagram client
+        image_path: Path to the image file
+        caption: Caption text for the photo
+        caption_file: Optional path to the caption file (derived from image_path if omitted)
+    
+    Returns:
+        True if upload successful, False otherwise
+    """
+    if not upload_photo_to_instagram(client, image_path, caption):
+        return False
+    
+    # Move uploaded files to uploaded directory
+    move_to_uploaded(image_path, caption_file)
+    return True
+
+
 # ============================================================================
 # MAIN FUNCTION
 # ============================================================================
@@ -574,6 +842,11 @@ def main():
         type=str,
         help='Custom caption text (optional)'
     )
+    parser.add_argument(
+        '--batch',
+        action='store_true',
+        help='Keep uploading images from images/ until it is empty, reusing one login'
+    )
     parser.add_argument(
         '--list-vars',
         action='store_true',
@@ -581,12 +854,16 @@ def main():
     )
     args = parser.parse_args()
     
+    if args.batch and args.image:
+        parser.error("--batch cannot be combined with --image")
+    
     # Handle --list-vars flag
     if args.list_vars:
         list_available_variables()
         sys.exit(0)
     
     # Load environment variables
+    from dotenv import load_dotenv
     load_dotenv()
     username = os.getenv('INSTAGRAM_USERNAME')
     password = os.getenv('INSTAGRAM_PASSWORD')
@@ -603,34 +880,51 @@ def main():
     if args.image:
         image_path = Path(args.image)
         if not image_path.exists():
-            logger.error(f"Specified image not found: {image_path}")
+            logger.error("Specified image not found: %s", image_path)
             sys.exit(1)
     else:
         image_path = find_image_to_upload()
         if not image_path:
-            logger.error("No images found to upload")
+            logger.error("No images found to upload in %s", IMAGES_DIR)
             sys.exit(1)
     
     # Get caption for the image
-    caption = get_caption_for_image(image_path, args.caption)
+    caption_file = _caption_path_for(image_path)
+    caption = get_caption_for_image(image_path, args.caption, caption_file)
     
     # Login to Instagram
     try:
         client = login_instagram(username, password)
     except Exception as e:
-        logger.error(f"Failed to login: {e}")
+        logger.error("Failed to login: %s", e)
         sys.exit(1)
     
-    # Upload the photo
-    upload_success = upload_photo_to_instagram(client, image_path, caption)
+    # Upload the photo (in batch mode, keep going with the same client)
+    uploaded_count = 0
+    while True:
+        if not upload_and_archive(client, image_path, caption, caption_file):
+            logger.error("✗ Upload failed")
+            sys.exit(1)
+        uploaded_count += 1
+        
+        if not args.batch:
+            break
+        
+        image_path = find_image_to_upload()
+        if not image_path:
+            break
+        
+        # Space out posts to avoid bot detection
+        delay = random.uniform(*BATCH_DELAY_RANGE)
+        logger.info("Waiting %.0f seconds before next upload...", delay)
+        time.sleep(delay)
+        
+        caption_file = _caption_path_for(image_path)
+        caption = get_caption_for_image(image_path, args.caption, caption_file)
     
-    if upload_success:
-        # Move uploaded files to uploaded directory
-        move_to_uploaded(image_path)
-        logger.info("✓ Upload process completed successfully!")
-    else:
-        logger.error("✗ Upload failed")
-        sys.exit(1)
+    if args.batch:
+        logger.info("Batch finished: %d image(s) uploaded", uploaded_count)
+    logger.info("✓ Upload process completed successfully!")
 
 
 if __name__ == "__main__":